@@ -0,0 +1,154 @@
+# backend/aes_engine.py
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import padding
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+import os
+import base64
+import secrets
+import asyncio
+import threading
+
+# AES-256-CBC with a random 16-byte IV prepended, base64 encoded
+# Must stay compatible with src/utils/crypto.js
+
+BLOCK_SIZE = 16
+
+# Batches at least this large are split across a process pool (0 = never)
+# Off by default: in-process bulk already avoids per-message key decoding, and
+# the pool only pays off on multi-core hosts; tune with bench_aes.py
+PROCESS_POOL_THRESHOLD = int(os.environ.get("AES_POOL_THRESHOLD", "0"))
+PROCESS_POOL_CHUNK = 1000
+PROCESS_POOL_WORKERS = int(os.environ.get("AES_POOL_WORKERS", "0")) or None
+
+KEY_CACHE_SIZE = 1024
+
+_key_cache = OrderedDict()  # chat_id (or key string) -> (aes_key_base64, AES algorithm)
+_key_cache_lock = threading.Lock()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _algorithm(aes_key_base64: str, chat_id: str = None):
+    """
+    Return the AES algorithm object for a key, decoding it at most once
+    Entries are keyed by chat_id so a rotated key replaces the old one
+    """
+    cache_key = chat_id or aes_key_base64
+    with _key_cache_lock:
+        entry = _key_cache.get(cache_key)
+        if entry is not None and entry[0] == aes_key_base64:
+            _key_cache.move_to_end(cache_key)
+            return entry[1]
+
+    algorithm = algorithms.AES(base64.b64decode(aes_key_base64))
+
+    with _key_cache_lock:
+        _key_cache[cache_key] = (aes_key_base64, algorithm)
+        _key_cache.move_to_end(cache_key)
+        if len(_key_cache) > KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return algorithm
+
+
+def _encrypt(message: str, algorithm) -> str:
+    padder = padding.PKCS7(128).padder()
+    data = padder.update(message.encode('utf-8')) + padder.finalize()
+
+    iv = secrets.token_bytes(BLOCK_SIZE)
+    encryptor = Cipher(algorithm, modes.CBC(iv), backend=default_backend()).encryptor()
+    encrypted = encryptor.update(data) + encryptor.finalize()
+
+    return base64.b64encode(iv + encrypted).decode('utf-8')
+
+
+def _decrypt(encrypted_base64: str, algorithm) -> str:
+    combined = base64.b64decode(encrypted_base64)
+    iv, encrypted = combined[:BLOCK_SIZE], combined[BLOCK_SIZE:]
+
+    decryptor = Cipher(algorithm, modes.CBC(iv), backend=default_backend()).decryptor()
+    padded_data = decryptor.update(encrypted) + decryptor.finalize()
+
+    unpadder = padding.PKCS7(128).unpadder()
+    data = unpadder.update(padded_data) + unpadder.finalize()
+
+    return data.decode('utf-8')
+
+
+def encrypt(message: str, aes_key_base64: str, chat_id: str = None) -> str:
+    """Encrypt a single message"""
+    return _encrypt(message, _algorithm(aes_key_base64, chat_id))
+
+
+def decrypt(encrypted_base64: str, aes_key_base64: str, chat_id: str = None) -> str:
+    """Decrypt a single message"""
+    return _decrypt(encrypted_base64, _algorithm(aes_key_base64, chat_id))
+
+
+def _encrypt_chunk(messages: list, aes_key_base64: str, chat_id: str = None) -> list:
+    algorithm = _algorithm(aes_key_base64, chat_id)
+    return [_encrypt(m, algorithm) for m in messages]
+
+
+def _decrypt_chunk(encrypted: list, aes_key_base64: str, chat_id: str = None) -> list:
+    algorithm = _algorithm(aes_key_base64, chat_id)
+    return [_decrypt(m, algorithm) for m in encrypted]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS)
+        return _pool
+
+
+def _run_bulk(chunk_fn, items: list, aes_key_base64: str, chat_id: str = None) -> list:
+    """
+    Apply chunk_fn to items in-process, or across the process pool for large batches
+    Worker processes keep their own key cache, so only the key string is sent
+    """
+    if not PROCESS_POOL_THRESHOLD or len(items) < PROCESS_POOL_THRESHOLD:
+        return chunk_fn(items, aes_key_base64, chat_id)
+
+    chunks = [items[i:i + PROCESS_POOL_CHUNK]
+              for i in range(0, len(items), PROCESS_POOL_CHUNK)]
+    results = []
+    for chunk_result in _get_pool().map(chunk_fn, chunks, [aes_key_base64] * len(chunks)):
+        results.extend(chunk_result)
+    return results
+
+
+def encrypt_many(messages: list, aes_key_base64: str, chat_id: str = None) -> list:
+    """
+    Encrypt a list of plaintext messages with one chat key
+    Returns ciphertexts in the same order
+    """
+    return _run_bulk(_encrypt_chunk, messages, aes_key_base64, chat_id)
+
+
+def decrypt_many(encrypted: list, aes_key_base64: str, chat_id: str = None) -> list:
+    """
+    Decrypt a list of base64 ciphertexts with one chat key
+    Returns plaintexts in the same order
+    """
+    return _run_bulk(_decrypt_chunk, encrypted, aes_key_base64, chat_id)
+
+
+def reencrypt_many(encrypted: list, old_key_base64: str, new_key_base64: str) -> list:
+    """Decrypt with the old key and encrypt with the new one (key rotation)"""
+    return encrypt_many(decrypt_many(encrypted, old_key_base64), new_key_base64)
+
+
+async def encrypt_many_async(messages: list, aes_key_base64: str, chat_id: str = None) -> list:
+    """encrypt_many without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, encrypt_many, messages, aes_key_base64, chat_id)
+
+
+async def decrypt_many_async(encrypted: list, aes_key_base64: str, chat_id: str = None) -> list:
+    """decrypt_many without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, decrypt_many, encrypted, aes_key_base64, chat_id)
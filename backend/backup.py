@@ -0,0 +1,242 @@
+# backend/backup.py
+"""
+Streaming export/import of /users and /chats as newline-delimited JSON
+
+Never loads a whole collection: records are read page by page with
+order_by_key ranges and written one line per record. The default export
+runs in constant memory; --workers trades memory for speed by loading the
+collection's full key list to plan parallel ranges.
+
+Usage (from backend/):
+    python backup.py export backup.ndjson [--collections users chats]
+                     [--page-size 500] [--workers 4] [--resume]
+    python backup.py import backup.ndjson [--batch-size 500]
+                     [--batch-bytes 8388608] [--resume]
+
+Each line is {"collection": "users", "key": "<uid>", "value": {...}}.
+Progress is checkpointed to <file>.checkpoint so an interrupted run can
+continue with --resume.
+"""
+from _firebase import get_db_ref
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import os
+import sys
+import json
+import argparse
+
+COLLECTIONS = ("users", "chats")
+
+# Stay well below the 16 MB per-write limit for RTDB SDK requests
+DEFAULT_BATCH_BYTES = 8 * 1024 * 1024
+
+# RTDB key ordering: 32-bit integer keys first (numerically), then strings
+_MAX_INT_KEY = 2 ** 31 - 1
+
+
+def _key_order(key: str):
+    if key.lstrip("-").isdigit() and abs(int(key)) <= _MAX_INT_KEY and str(int(key)) == key:
+        return (0, int(key), "")
+    return (1, 0, key)
+
+
+class Checkpoint:
+    """JSON progress file written atomically next to the data file"""
+
+    def __init__(self, path: str, resume: bool):
+        self.path = path
+        self.state = {}
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+
+    def get(self, name: str, default=None):
+        return self.state.get(name, default)
+
+    def set(self, **values):
+        self.state.update(values)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+def _fetch_page(collection: str, after_key: str, page_size: int) -> dict:
+    """Next page_size records of a collection with keys after after_key"""
+    query = get_db_ref(f"/{collection}").order_by_key()
+    if after_key is None:
+        return query.limit_to_first(page_size).get() or {}
+
+    # start_at is inclusive, so ask for one extra record and drop the cursor
+    records = query.start_at(after_key).limit_to_first(page_size + 1).get() or {}
+    records.pop(after_key, None)
+    return records
+
+
+def _fetch_range(collection: str, first_key: str, last_key: str) -> dict:
+    return get_db_ref(f"/{collection}").order_by_key() \
+        .start_at(first_key).end_at(last_key).get() or {}
+
+
+def _iter_pages(collection: str, after_key: str, page_size: int):
+    """Sequential cursor pagination, constant memory"""
+    while True:
+        records = _fetch_page(collection, after_key, page_size)
+        if not records:
+            return
+        yield records
+        after_key = next(reversed(records))
+
+
+def _iter_ranges(collection: str, after_key: str, page_size: int, workers: int):
+    """
+    Parallel pagination: plan key ranges from a shallow key listing, then
+    fetch up to 2 * workers ranges at a time and yield them in key order
+    """
+    keys = get_db_ref(f"/{collection}").get(shallow=True) or {}
+    keys = sorted(keys, key=_key_order)
+    if after_key is not None:
+        cursor = _key_order(after_key)
+        keys = [k for k in keys if _key_order(k) > cursor]
+
+    ranges = ((keys[i], keys[min(i + page_size, len(keys)) - 1])
+              for i in range(0, len(keys), page_size))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first_key, last_key in ranges:
+            pending.append(pool.submit(_fetch_range, collection, first_key, last_key))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def export_collections(out_path: str, collections=COLLECTIONS, page_size: int = 500,
+                       workers: int = 1, resume: bool = False):
+    """Stream collections to out_path, one record per line"""
+    checkpoint = Checkpoint(out_path + ".checkpoint", resume)
+
+    if resume and os.path.exists(out_path):
+        out = open(out_path, "r+b")
+        # Drop lines written after the last checkpoint
+        out.truncate(checkpoint.get("offset", 0))
+        out.seek(0, os.SEEK_END)
+    else:
+        out = open(out_path, "wb")
+
+    with out:
+        for collection in collections:
+            progress = checkpoint.get(collection, {})
+            if progress.get("done"):
+                print(f"{collection}: already exported, skipping")
+                continue
+
+            after_key = progress.get("last_key")
+            count = progress.get("count", 0)
+
+            if workers > 1:
+                pages = _iter_ranges(collection, after_key, page_size, workers)
+            else:
+                pages = _iter_pages(collection, after_key, page_size)
+
+            for records in pages:
+                if not records:
+                    continue
+                for key, value in records.items():
+                    line = json.dumps(
+                        {"collection": collection, "key": key, "value": value},
+                        separators=(",", ":"))
+                    out.write(line.encode("utf-8") + b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+
+                count += len(records)
+                after_key = next(reversed(records))
+                checkpoint.set(offset=out.tell(),
+                               **{collection: {"last_key": after_key, "count": count}})
+                print(f"{collection}: {count} records", end="\r")
+
+            checkpoint.set(**{collection: {"last_key": after_key, "count": count, "done": True}})
+            print(f"{collection}: {count} records exported")
+
+
+def import_records(in_path: str, batch_size: int = 500,
+                   batch_bytes: int = DEFAULT_BATCH_BYTES, resume: bool = False):
+    """
+    Write records from an export file back with multi-path updates
+    A batch is flushed at batch_size records or batch_bytes of serialized JSON,
+    whichever comes first. Existing records with the same key are replaced
+    """
+    checkpoint = Checkpoint(in_path + ".import-checkpoint", resume)
+    skip = checkpoint.get("lines", 0)
+    imported = checkpoint.get("records", 0)
+    root_ref = get_db_ref("/")
+
+    lines = skip
+    batch = {}
+    size = 0
+
+    def flush():
+        nonlocal batch, size, imported
+        root_ref.update(batch)
+        imported += len(batch)
+        batch = {}
+        size = 0
+        # lines is the resume position, records the number actually written
+        checkpoint.set(lines=lines, records=imported)
+        print(f"imported {imported} records", end="\r")
+
+    with open(in_path, "rb") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number <= skip or not line.strip():
+                continue
+            if batch and size + len(line) > batch_bytes:
+                flush()
+
+            record = json.loads(line)
+            batch[f"{record['collection']}/{record['key']}"] = record["value"]
+            size += len(line)
+            lines = line_number
+
+            if len(batch) >= batch_size:
+                flush()
+
+    if batch:
+        flush()
+    checkpoint.set(lines=lines, records=imported)
+    print(f"imported {imported} records")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WooshChat backup tool")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="Export collections to NDJSON")
+    export_parser.add_argument("out")
+    export_parser.add_argument("--collections", nargs="+", default=list(COLLECTIONS),
+                               choices=COLLECTIONS)
+    export_parser.add_argument("--page-size", type=int, default=500)
+    export_parser.add_argument("--workers", type=int, default=1,
+                               help="parallel range fetchers; faster, but loads the full key "
+                                    "list, so memory grows with the number of records")
+    export_parser.add_argument("--resume", action="store_true")
+
+    import_parser = sub.add_parser("import", help="Import an NDJSON export")
+    import_parser.add_argument("input")
+    import_parser.add_argument("--batch-size", type=int, default=500)
+    import_parser.add_argument("--batch-bytes", type=int, default=DEFAULT_BATCH_BYTES,
+                               help="flush a batch once its serialized size passes this")
+    import_parser.add_argument("--resume", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_collections(args.out, args.collections, args.page_size,
+                           args.workers, args.resume)
+    else:
+        import_records(args.input, args.batch_size, args.batch_bytes, args.resume)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# backend/bench_aes.py
+"""
+Messages per second for single vs bulk AES encrypt/decrypt
+
+Usage (from backend/):
+    python bench_aes.py [message_count]
+"""
+import os
+import sys
+import time
+import base64
+import secrets
+import aes_engine
+
+
+def rate(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    key = base64.b64encode(secrets.token_bytes(32)).decode("utf-8")
+    messages = [f"message {i} " + secrets.token_hex(24) for i in range(count)]
+    encrypted = aes_engine._encrypt_chunk(messages, key)
+
+    # Start the pool before timing so worker startup is not counted
+    workers = aes_engine.PROCESS_POOL_WORKERS or os.cpu_count()
+    pool = aes_engine._get_pool()
+    list(pool.map(aes_engine._encrypt_chunk, [messages[:10]] * workers, [key] * workers))
+
+    def in_process(chunk_fn, items):
+        return lambda: chunk_fn(items, key)
+
+    def pooled(chunk_fn, items):
+        def run():
+            threshold = aes_engine.PROCESS_POOL_THRESHOLD
+            aes_engine.PROCESS_POOL_THRESHOLD = 1
+            try:
+                aes_engine._run_bulk(chunk_fn, items, key)
+            finally:
+                aes_engine.PROCESS_POOL_THRESHOLD = threshold
+        return run
+
+    print(f"Messages: {count}  (pool workers: {workers}, "
+          f"threshold: {aes_engine.PROCESS_POOL_THRESHOLD or 'off'})")
+    print(f"single encrypt:      {rate(lambda: [aes_engine.encrypt(m, key) for m in messages], count):>12,.0f} msg/s")
+    print(f"single decrypt:      {rate(lambda: [aes_engine.decrypt(m, key) for m in encrypted], count):>12,.0f} msg/s")
+    print(f"bulk encrypt (proc): {rate(in_process(aes_engine._encrypt_chunk, messages), count):>12,.0f} msg/s")
+    print(f"bulk decrypt (proc): {rate(in_process(aes_engine._decrypt_chunk, encrypted), count):>12,.0f} msg/s")
+    print(f"bulk encrypt (pool): {rate(pooled(aes_engine._encrypt_chunk, messages), count):>12,.0f} msg/s")
+    print(f"bulk decrypt (pool): {rate(pooled(aes_engine._decrypt_chunk, encrypted), count):>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# backend/bench_presence.py
+"""
+Heartbeat and presence lookup throughput with thousands of concurrent users
+
+Usage (from backend/):
+    python bench_presence.py [user_count] [rounds]
+"""
+import sys
+import time
+import asyncio
+import presence
+
+
+async def run(users: int, rounds: int):
+    presence.set_backend(presence.MemoryBackend())
+    uids = [f"user-{i}" for i in range(users)]
+
+    # Every user heartbeats concurrently, `rounds` times
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(presence.heartbeat(uid) for uid in uids))
+    elapsed = time.perf_counter() - start
+    beats = users * rounds
+    print(f"heartbeats:      {beats / elapsed:>12,.0f} /s  ({beats} in {elapsed * 1000:.1f} ms)")
+
+    # /chat/list style lookup: each user checks 20 peers
+    start = time.perf_counter()
+    for i, uid in enumerate(uids):
+        await presence.online_uids(uids[i:i + 20])
+    elapsed = time.perf_counter() - start
+    print(f"presence lookups:{users / elapsed:>12,.0f} /s  (20 peers each)")
+
+    online = await presence.online_uids(uids)
+    print(f"online users:    {len(online):>12}")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"Users: {users}  rounds: {rounds}")
+    asyncio.run(run(users, rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# backend/bench_responses.py
+"""
+Compare serialization time and payload size for message-heavy responses
+
+Usage (from backend/):
+    python bench_responses.py [message_count]
+"""
+import sys
+import time
+import asyncio
+import gzip
+import secrets
+import base64
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+import responses
+from responses import (
+    dumps, brotli, FastJSONResponse, CompressionMiddleware, _iter_json_list
+)
+
+
+def build_payload(count: int) -> dict:
+    """Build a /chat/{id}/messages style payload with count messages"""
+    now = int(time.time())
+    messages = []
+    for i in range(count):
+        messages.append({
+            "message_id": f"-N{secrets.token_hex(9)}",
+            "sender_uid": f"-M{secrets.token_hex(9)}",
+            "encrypted_text": base64.b64encode(secrets.token_bytes(64)).decode("utf-8"),
+            "timestamp": now + i,
+            "status": "read" if i % 2 else "unread",
+            "read_at": now + i if i % 2 else None,
+            "expires_at": now + i + 60 if i % 2 else None
+        })
+    return {
+        "messages": messages,
+        "aes_key": base64.b64encode(secrets.token_bytes(32)).decode("utf-8")
+    }
+
+
+def timeit(fn, repeat: int = 20) -> float:
+    """Return the best wall time in milliseconds over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def serve(make_response, accept_encoding: bytes = b"identity") -> bytes:
+    """
+    Send a response through CompressionMiddleware to a stub ASGI send,
+    the same path a served request takes; returns the body bytes
+    """
+    body = []
+
+    async def app(scope, receive, send):
+        await make_response()(scope, receive, send)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [
+        (b"accept-encoding", accept_encoding)]}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+    return b"".join(body)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    payload = build_payload(count)
+
+    # What FastAPI sends by default: jsonable_encoder + Starlette JSONResponse
+    baseline = lambda: JSONResponse(jsonable_encoder(payload)).body
+    fast = lambda: dumps(payload)
+
+    baseline_body = baseline()
+    fast_body = fast()
+
+    print(f"Messages: {count}")
+    print(f"JSONResponse (default): {timeit(baseline):8.2f} ms  {len(baseline_body):>9} bytes")
+    print(f"fast dumps:             {timeit(fast):8.2f} ms  {len(fast_body):>9} bytes")
+    print(f"gzip (level 6):         {timeit(lambda: gzip.compress(fast_body, 6)):8.2f} ms  "
+          f"{len(gzip.compress(fast_body, 6)):>9} bytes")
+    if brotli is not None:
+        print(f"brotli (quality 4):     {timeit(lambda: brotli.compress(fast_body, quality=4)):8.2f} ms  "
+              f"{len(brotli.compress(fast_body, quality=4)):>9} bytes")
+    else:
+        print("brotli: not installed")
+
+    # Served paths, timed through the real response classes
+    extra = {"aes_key": payload["aes_key"]}
+    whole = lambda: FastJSONResponse(payload)
+    streamed = lambda: StreamingResponse(
+        _iter_json_list("messages", payload["messages"], extra), media_type="application/json")
+    encodings = [(b"identity", "identity"), (b"gzip", "gzip")]
+    if brotli is not None:
+        encodings.append((b"br", "br"))
+    print(f"served (chunk size {responses.STREAM_CHUNK_SIZE}):")
+    for accept, label in encodings:
+        for name, make in (("whole", whole), ("streamed", streamed)):
+            served = lambda: serve(make, accept)
+            print(f"  {name:>8} {label:<9}      {timeit(served):8.2f} ms  {len(served()):>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
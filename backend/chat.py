@@ -3,6 +3,8 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, EmailStr
 from _firebase import get_db_ref
 from protected import verify_token_from_header
+from responses import FastJSONResponse, json_list_response
+from presence import heartbeat, online_uids
 from crypto_utils import (
     generate_dh_keypair,
     compute_shared_secret,
@@ -167,6 +169,11 @@ async def list_chats(request: Request):
     user_chats_ref = get_db_ref(f"/users/{user_uid}/chats")
     user_chats = user_chats_ref.get() or {}
 
+    # Polling the chat list keeps the user online; presence is held in memory
+    await heartbeat(user_uid)
+    online = await online_uids(
+        chat_info.get("peer_uid") for chat_info in user_chats.values())
+
     chat_list = []
     for chat_id, chat_info in user_chats.items():
         unread_count = chat_info.get("unread_count", 0)
@@ -175,10 +182,11 @@ async def list_chats(request: Request):
             "peer_email": chat_info.get("peer_email"),
             "peer_uid": chat_info.get("peer_uid"),
             "created_at": chat_info.get("created_at"),
-            "unread_count": unread_count
+            "unread_count": unread_count,
+            "peer_online": chat_info.get("peer_uid") in online
         })
 
-    return {"chats": chat_list}
+    return json_list_response("chats", chat_list)
 
 
 @router.get("/chat/{chat_id}")
@@ -202,10 +210,10 @@ async def get_chat_details(chat_id: str, request: Request):
         raise HTTPException(
             status_code=403, detail="You are not a participant in this chat")
 
-    return {
+    return FastJSONResponse({
         "chat_id": chat_id,
         "participants": participants,
         "aes_key": chat_data.get("aes_key"),
         "created_at": chat_data.get("created_at"),
         "status": chat_data.get("status")
-    }
+    })
@@ -4,6 +4,10 @@ from protected import router as protected_router
 from login import router as login_router
 from signup import router as signup_router
 from messages import router as messages_router, cleanup_expired_messages
+from rate_limit import router as rate_limit_router
+from presence import router as presence_router
+from responses import FastJSONResponse, CompressionMiddleware
+from profiling import ProfilingMiddleware, profiling_configured
 import os
 import asyncio
 from fastapi import FastAPI
@@ -12,7 +16,7 @@ from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Allow frontend (Vite) to call backend
 app.add_middleware(
@@ -24,6 +28,13 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# gzip/brotli for large payloads (message histories, chat lists)
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in request profiling (PROFILE_ENABLED / PROFILE_TOKEN); not installed otherwise
+if profiling_configured():
+    app.add_middleware(ProfilingMiddleware)
+
 # import and include routers
 
 app.include_router(signup_router)
@@ -31,6 +42,8 @@ app.include_router(login_router)
 app.include_router(protected_router)
 app.include_router(chat_router)
 app.include_router(messages_router)
+app.include_router(rate_limit_router)
+app.include_router(presence_router)
 
 
 @app.on_event("startup")
@@ -3,12 +3,11 @@ from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
 from pydantic import BaseModel
 from _firebase import get_db_ref
 from protected import verify_token_from_header
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
-import base64
+from responses import json_list_response
+from rate_limit import enforce_rate_limit
+from presence import heartbeat, online_uids, typing_uids
+import aes_engine
 import time
-import secrets
 import asyncio
 
 router = APIRouter()
@@ -22,57 +21,21 @@ class MarkReadRequest(BaseModel):
     message_id: str
 
 
-def encrypt_message_server(message: str, aes_key_base64: str) -> str:
+def encrypt_message_server(message: str, aes_key_base64: str, chat_id: str = None) -> str:
     """
     Encrypt message using AES-256-CBC (server-side encryption)
     This matches the frontend crypto.js implementation
+    See aes_engine.encrypt_many for batches
     """
-    # Decode the base64 AES key
-    aes_key = base64.b64decode(aes_key_base64)
+    return aes_engine.encrypt(message, aes_key_base64, chat_id)
 
-    # Generate random IV (16 bytes for AES)
-    iv = secrets.token_bytes(16)
 
-    # Pad the message
-    padder = padding.PKCS7(128).padder()
-    padded_data = padder.update(message.encode('utf-8')) + padder.finalize()
-
-    # Encrypt
-    cipher = Cipher(algorithms.AES(aes_key), modes.CBC(iv),
-                    backend=default_backend())
-    encryptor = cipher.encryptor()
-    encrypted = encryptor.update(padded_data) + encryptor.finalize()
-
-    # Combine IV and encrypted data, then base64 encode
-    combined = iv + encrypted
-    return base64.b64encode(combined).decode('utf-8')
-
-
-def decrypt_message_server(encrypted_base64: str, aes_key_base64: str) -> str:
+def decrypt_message_server(encrypted_base64: str, aes_key_base64: str, chat_id: str = None) -> str:
     """
     Decrypt message using AES-256-CBC (server-side decryption)
+    See aes_engine.decrypt_many for batches
     """
-    # Decode the base64 AES key
-    aes_key = base64.b64decode(aes_key_base64)
-
-    # Decode the encrypted data
-    combined = base64.b64decode(encrypted_base64)
-
-    # Split IV and encrypted data
-    iv = combined[:16]
-    encrypted = combined[16:]
-
-    # Decrypt
-    cipher = Cipher(algorithms.AES(aes_key), modes.CBC(iv),
-                    backend=default_backend())
-    decryptor = cipher.decryptor()
-    padded_data = decryptor.update(encrypted) + decryptor.finalize()
-
-    # Unpad
-    unpadder = padding.PKCS7(128).unpadder()
-    data = unpadder.update(padded_data) + unpadder.finalize()
-
-    return data.decode('utf-8')
+    return aes_engine.decrypt(encrypted_base64, aes_key_base64, chat_id)
 
 
 @router.post("/chat/{chat_id}/send")
@@ -84,6 +47,7 @@ async def send_message(chat_id: str, body: SendMessageRequest, request: Request)
     # Verify the requesting user
     payload = verify_token_from_header(request)
     sender_uid = payload.get("uid")
+    await enforce_rate_limit(sender_uid, "send")
 
     # Verify chat exists and user is participant
     chat_ref = get_db_ref(f"/chats/{chat_id}")
@@ -140,6 +104,7 @@ async def get_messages(chat_id: str, request: Request):
     # Verify the requesting user
     payload = verify_token_from_header(request)
     user_uid = payload.get("uid")
+    await enforce_rate_limit(user_uid, "poll")
 
     # Verify chat exists and user is participant
     chat_ref = get_db_ref(f"/chats/{chat_id}")
@@ -179,10 +144,18 @@ async def get_messages(chat_id: str, request: Request):
     # Sort by timestamp
     messages_list.sort(key=lambda x: x.get("timestamp", 0))
 
-    return {
-        "messages": messages_list,
-        "aes_key": chat_data.get("aes_key")
-    }
+    # Presence/typing for the other participants (in memory, no Firebase writes)
+    await heartbeat(user_uid)
+    peer_uids = [uid for uid in participants if uid != user_uid]
+    online = await online_uids(peer_uids)
+    typing = await typing_uids(chat_id, peer_uids)
+
+    return json_list_response(
+        "messages", messages_list, {
+            "aes_key": chat_data.get("aes_key"),
+            "peer_online": bool(online),
+            "typing": sorted(typing)
+        })
 
 
 @router.post("/chat/{chat_id}/mark-read")
@@ -247,6 +220,7 @@ async def mark_all_messages_read(chat_id: str, request: Request):
     # Verify the requesting user
     payload = verify_token_from_header(request)
     user_uid = payload.get("uid")
+    await enforce_rate_limit(user_uid, "poll")
 
     # Verify chat exists and user is participant
     chat_ref = get_db_ref(f"/chats/{chat_id}")
@@ -0,0 +1,153 @@
+# backend/presence.py
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from _firebase import get_db_ref
+from protected import verify_token_from_header
+from rate_limit import enforce_rate_limit
+from shared_state import ExpiringMap, get_redis_client, use_redis, REDIS_UNAVAILABLE
+import os
+import time
+import threading
+
+router = APIRouter()
+
+# Presence and typing state is ephemeral: it lives in memory (or Redis)
+# and is never written to Firebase
+
+ONLINE_TTL = int(os.environ.get("PRESENCE_ONLINE_TTL", "30"))
+TYPING_TTL = int(os.environ.get("PRESENCE_TYPING_TTL", "5"))
+
+
+class TypingRequest(BaseModel):
+    typing: bool
+
+
+class MemoryBackend:
+    """
+    In-process TTL map
+    Only correct for a single worker; use RedisBackend when running several
+    """
+
+    def __init__(self):
+        self._expires = ExpiringMap()
+        self._lock = threading.Lock()
+
+    async def touch(self, key: str, ttl: float):
+        now = time.monotonic()
+        with self._lock:
+            self._expires.set(key, True, now + ttl, now)
+
+    async def clear(self, key: str):
+        with self._lock:
+            self._expires.pop(key)
+
+    async def alive(self, keys: list) -> set:
+        now = time.monotonic()
+        with self._lock:
+            return {k for k in keys if self._expires.get(k, now)}
+
+
+class RedisBackend:
+    """
+    TTL keys in Redis so all workers see the same presence state
+    Presence is best effort: if Redis is unreachable, errors are logged and
+    everyone simply appears offline instead of failing the request
+    """
+
+    def __init__(self, prefix: str = "woosh:presence:"):
+        self._client = get_redis_client()
+        self._prefix = prefix
+
+    async def touch(self, key: str, ttl: float):
+        try:
+            await self._client.set(self._prefix + key, 1, ex=max(1, int(ttl)))
+        except REDIS_UNAVAILABLE as e:
+            print(f"Error in presence touch: {e}")
+
+    async def clear(self, key: str):
+        try:
+            await self._client.delete(self._prefix + key)
+        except REDIS_UNAVAILABLE as e:
+            print(f"Error in presence clear: {e}")
+
+    async def alive(self, keys: list) -> set:
+        if not keys:
+            return set()
+        try:
+            values = await self._client.mget([self._prefix + k for k in keys])
+        except REDIS_UNAVAILABLE as e:
+            print(f"Error in presence lookup: {e}")
+            return set()
+        return {k for k, v in zip(keys, values) if v is not None}
+
+
+_backend = RedisBackend() if use_redis("PRESENCE_BACKEND") else MemoryBackend()
+
+
+def set_backend(backend):
+    """Swap the presence backend (anything with async touch/clear/alive)"""
+    global _backend
+    _backend = backend
+
+
+def _online_key(uid: str) -> str:
+    return f"online:{uid}"
+
+
+def _typing_key(chat_id: str, uid: str) -> str:
+    return f"typing:{chat_id}:{uid}"
+
+
+async def heartbeat(uid: str):
+    """Mark uid as online for ONLINE_TTL seconds"""
+    await _backend.touch(_online_key(uid), ONLINE_TTL)
+
+
+async def online_uids(uids: list) -> set:
+    """Subset of uids that sent a heartbeat recently"""
+    uids = list(uids)
+    alive = await _backend.alive([_online_key(uid) for uid in uids])
+    return {uid for uid in uids if _online_key(uid) in alive}
+
+
+async def typing_uids(chat_id: str, uids: list) -> set:
+    """Subset of uids currently typing in chat_id"""
+    uids = list(uids)
+    alive = await _backend.alive([_typing_key(chat_id, uid) for uid in uids])
+    return {uid for uid in uids if _typing_key(chat_id, uid) in alive}
+
+
+@router.post("/presence/heartbeat")
+async def presence_heartbeat(request: Request):
+    """
+    Keep the current user online
+    Polling /chat/list or /chat/{chat_id}/messages also counts as a heartbeat
+    """
+    payload = verify_token_from_header(request)
+    await heartbeat(payload.get("uid"))
+    return {"status": "online", "ttl": ONLINE_TTL}
+
+
+@router.post("/chat/{chat_id}/typing")
+async def set_typing(chat_id: str, body: TypingRequest, request: Request):
+    """
+    Start or stop the typing indicator for the current user in a chat
+    Clients should resend typing=true while the user keeps typing
+    """
+    payload = verify_token_from_header(request)
+    user_uid = payload.get("uid")
+    await enforce_rate_limit(user_uid, "typing")
+
+    # Read only the participant entry, not the whole chat
+    participant = get_db_ref(f"/chats/{chat_id}/participants/{user_uid}").get()
+    if not participant:
+        raise HTTPException(
+            status_code=403, detail="You are not a participant in this chat")
+
+    await heartbeat(user_uid)
+    if body.typing:
+        await _backend.touch(_typing_key(chat_id, user_uid), TYPING_TTL)
+    else:
+        await _backend.clear(_typing_key(chat_id, user_uid))
+
+    return {"typing": body.typing, "ttl": TYPING_TTL}
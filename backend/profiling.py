@@ -0,0 +1,208 @@
+# backend/profiling.py
+import os
+import re
+import sys
+import time
+import heapq
+import random
+import fnmatch
+import secrets
+import cProfile
+import threading
+from collections import Counter
+
+# Opt-in request profiling
+#   PROFILE_ENABLED=1          profile a sample of matching requests
+#   PROFILE_SAMPLE_RATE=0.01   fraction of matching requests to profile
+#   PROFILE_TOKEN=...          also profile any request sending X-Profile: <token>
+#   PROFILE_ROUTES=...         comma separated path patterns, e.g. /chat/init,/chat/*/messages
+#   PROFILE_MODE=sample        "sample" (stack sampler, .folded) or "cprofile" (.prof)
+#   PROFILE_DIR=./profiles     where profiles are written
+#   PROFILE_KEEP=20            only the slowest N profiles are kept
+# When neither PROFILE_ENABLED nor PROFILE_TOKEN is set the middleware is not installed.
+
+PROFILE_ENABLED = os.environ.get("PROFILE_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+PROFILE_ROUTES = [p.strip() for p in os.environ.get("PROFILE_ROUTES", "*").split(",") if p.strip()]
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample").lower()
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "profiles"))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "20"))
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", "1")) / 1000
+
+
+def profiling_configured() -> bool:
+    return PROFILE_ENABLED or bool(PROFILE_TOKEN)
+
+
+class StackSampler:
+    """
+    Statistical profiler: samples one thread's stack every `interval` seconds
+    and counts collapsed stacks (flamegraph.pl / speedscope "folded" format)
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CProfileCollector:
+    """Deterministic profiler, dumps a pstats file (snakeviz, flameprof, gprof2dot)"""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def dump(self, path: str):
+        self._profile.dump_stats(path)
+
+
+class SlowestRetention:
+    """
+    Keep only the files of the `keep` slowest profiled requests in `directory`
+    Durations are parsed back from filenames, so files left by earlier runs or
+    other workers count towards the limit too
+    """
+
+    FILENAME = re.compile(r"^(\d+(?:\.\d+)?)ms-.*\.(?:folded|prof)$")
+
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self._heap = []  # (duration, path), fastest on top
+        self._lock = threading.Lock()
+        with self._lock:
+            self._load()
+            self._evict()
+
+    def _load(self):
+        heap = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            match = self.FILENAME.match(name)
+            if match:
+                heap.append((float(match.group(1)) / 1000, os.path.join(self.directory, name)))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def _evict(self):
+        while len(self._heap) > self.keep:
+            _, evicted = heapq.heappop(self._heap)
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+
+    def offer(self, duration: float) -> bool:
+        """Would a profile of this duration be kept?"""
+        with self._lock:
+            return len(self._heap) < self.keep or duration > self._heap[0][0]
+
+    def add(self, duration: float, path: str):
+        with self._lock:
+            # Rescan so files written by other workers are taken into account
+            self._load()
+            if not any(p == path for _, p in self._heap):
+                heapq.heappush(self._heap, (duration, path))
+            self._evict()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests
+    The event loop runs every coroutine on one thread, so only one request is
+    profiled at a time; samples include other requests running concurrently
+    """
+
+    def __init__(self, app):
+        self.app = app
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        self.retention = SlowestRetention()
+        self._busy = threading.Lock()
+
+    def _should_profile(self, scope) -> bool:
+        path = scope.get("path", "")
+        if not any(fnmatch.fnmatchcase(path, pattern) for pattern in PROFILE_ROUTES):
+            return False
+
+        if PROFILE_TOKEN:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile":
+                    return secrets.compare_digest(value.decode("latin-1"), PROFILE_TOKEN)
+
+        return PROFILE_ENABLED and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._busy.acquire(blocking=False):
+            # Another request is being profiled
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if PROFILE_MODE == "cprofile":
+                collector, ext = CProfileCollector(), "prof"
+            else:
+                collector, ext = StackSampler(threading.get_ident()), "folded"
+
+            collector.start()
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                duration = time.perf_counter() - start
+                collector.stop()
+
+            if self.retention.offer(duration):
+                self._write(collector, ext, scope, duration)
+        finally:
+            self._busy.release()
+
+    def _write(self, collector, ext: str, scope, duration: float):
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope.get("path", "")).strip("_") or "root"
+        filename = f"{duration * 1000:010.1f}ms-{scope.get('method', 'GET')}-{route}-{int(time.time() * 1000)}.{ext}"
+        path = os.path.join(PROFILE_DIR, filename)
+        try:
+            collector.dump(path)
+        except OSError as e:
+            print(f"Error writing profile {path}: {e}")
+            return
+        self.retention.add(duration, path)
@@ -0,0 +1,190 @@
+# backend/rate_limit.py
+from fastapi import APIRouter, HTTPException, Request
+import os
+from shared_state import ExpiringMap, get_redis_client, use_redis, REDIS_UNAVAILABLE
+import math
+import time
+import secrets
+import threading
+from collections import OrderedDict
+
+router = APIRouter()
+
+
+def _limit_from_env(route_class: str, rate: float, burst: int):
+    """
+    Read (tokens per second, bucket capacity) for a route class
+    e.g. RATE_LIMIT_SEND_RATE=1 RATE_LIMIT_SEND_BURST=5
+    """
+    prefix = f"RATE_LIMIT_{route_class.upper()}"
+    return (
+        float(os.environ.get(f"{prefix}_RATE", rate)),
+        int(os.environ.get(f"{prefix}_BURST", burst)),
+    )
+
+
+# Route class -> (tokens refilled per second, bucket capacity)
+# "poll" covers the ChatView loop (mark-all-read + messages every 2s)
+# "typing" covers typing indicators (ChatView sends at most one every 2s)
+ROUTE_LIMITS = {
+    "send": _limit_from_env("send", 1.0, 5),
+    "poll": _limit_from_env("poll", 2.0, 20),
+    "typing": _limit_from_env("typing", 1.0, 5),
+}
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
+class MemoryBackend:
+    """
+    In-process token buckets keyed by string
+    Only correct for a single worker; use RedisBackend when running several
+    """
+
+    def __init__(self):
+        # key -> (tokens, last_refill); a bucket expires once it would be full
+        # again, since a full bucket is indistinguishable from a new one
+        self._buckets = ExpiringMap()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        """
+        Take one token from the bucket
+        Returns 0 when allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, now, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+
+            full_after = now + (capacity - tokens) / rate
+            self._buckets.set(key, (tokens, now), full_after, now)
+
+        return retry_after
+
+
+class RedisBackend:
+    """
+    Token buckets stored in Redis so all workers share the same limits
+    The refill/take step runs as a Lua script to stay atomic
+    """
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, prefix: str = "woosh:ratelimit:"):
+        self._script = get_redis_client().register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        try:
+            result = await self._script(
+                keys=[self._prefix + key], args=[rate, capacity, time.time()])
+        except REDIS_UNAVAILABLE as e:
+            # Fail open: an unreachable Redis must not turn every request into a 500
+            print(f"Error in rate limiter, allowing request: {e}")
+            return 0.0
+        return float(result)
+
+
+_backend = RedisBackend() if use_redis("RATE_LIMIT_BACKEND") else MemoryBackend()
+
+# Keep counters for at most this many (uid, route_class) pairs
+METRICS_MAX_ENTRIES = int(os.environ.get("RATE_LIMIT_METRICS_MAX", "10000"))
+
+# (uid, route_class) -> {"allowed": int, "throttled": int, "last_throttled_at": int | None}
+# Counters are per worker process; least recently active pairs are dropped first
+_metrics = OrderedDict()
+
+
+def set_backend(backend):
+    """Swap the bucket backend (anything with an async acquire(key, rate, capacity))"""
+    global _backend
+    _backend = backend
+
+
+def _record(uid: str, route_class: str, throttled: bool):
+    stats = _metrics.get((uid, route_class))
+    if stats is None:
+        stats = {"allowed": 0, "throttled": 0, "last_throttled_at": None}
+        _metrics[(uid, route_class)] = stats
+        if len(_metrics) > METRICS_MAX_ENTRIES:
+            _metrics.popitem(last=False)
+    else:
+        _metrics.move_to_end((uid, route_class))
+    if throttled:
+        stats["throttled"] += 1
+        stats["last_throttled_at"] = int(time.time())
+    else:
+        stats["allowed"] += 1
+
+
+async def enforce_rate_limit(uid: str, route_class: str):
+    """
+    Consume a token for uid on route_class
+    Raises 429 with a Retry-After header when the bucket is empty
+    """
+    rate, capacity = ROUTE_LIMITS[route_class]
+    retry_after = await _backend.acquire(f"{route_class}:{uid}", rate, capacity)
+
+    if retry_after > 0:
+        _record(uid, route_class, throttled=True)
+        seconds = max(1, math.ceil(retry_after))
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests, retry in {seconds}s",
+            headers={"Retry-After": str(seconds)})
+
+    _record(uid, route_class, throttled=False)
+
+
+def get_throttle_metrics():
+    """Per-user throttle counters for this worker, most throttled first"""
+    rows = [
+        {"uid": uid, "route_class": route_class, **stats}
+        for (uid, route_class), stats in _metrics.items()
+    ]
+    rows.sort(key=lambda row: row["throttled"], reverse=True)
+    return rows
+
+
+@router.get("/metrics/rate-limit")
+async def rate_limit_metrics(request: Request):
+    """
+    Export per-user throttle metrics
+    Disabled unless METRICS_TOKEN is set; callers must send it as X-Metrics-Token
+    """
+    provided = request.headers.get("X-Metrics-Token", "")
+    if not METRICS_TOKEN or not secrets.compare_digest(provided, METRICS_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return {
+        "pid": os.getpid(),
+        "limits": {
+            name: {"rate": rate, "burst": burst}
+            for name, (rate, burst) in ROUTE_LIMITS.items()
+        },
+        "users": get_throttle_metrics()
+    }
@@ -0,0 +1,210 @@
+# backend/responses.py
+from fastapi.responses import Response, StreamingResponse
+import os
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Lists with at least this many items are streamed instead of rendered at once
+# (0 = never). Off by default: the list is already built in memory, and
+# bench_responses.py shows the whole-body path is as fast or faster
+STREAM_THRESHOLD = int(os.environ.get("JSON_STREAM_THRESHOLD", "0"))
+STREAM_CHUNK_SIZE = 1000
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+
+def dumps(content) -> bytes:
+    """
+    Serialize content to compact JSON bytes
+    Uses orjson when available, stdlib json otherwise
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson
+    Returning this from a route skips FastAPI's jsonable_encoder pass,
+    so content must already be plain dicts/lists/str/int/None
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+async def _iter_json_list(key: str, items: list, extra: dict):
+    """
+    Yield a JSON object of the form {**extra, key: items} in chunks
+    Async so StreamingResponse sends each chunk without a threadpool hop
+    """
+    head = dumps(extra)  # b'{...}'
+    separator = b"," if len(head) > 2 else b""
+    yield head[:-1] + separator + dumps(key) + b":["
+
+    for start in range(0, len(items), STREAM_CHUNK_SIZE):
+        # One dumps call per chunk, minus the list brackets
+        chunk = dumps(items[start:start + STREAM_CHUNK_SIZE])[1:-1]
+        yield (b"," + chunk) if start else chunk
+
+    yield b"]}"
+
+
+def json_list_response(key: str, items: list, extra: dict = None) -> Response:
+    """
+    Build a response for {**extra, key: items}
+    Rendered in one go unless JSON_STREAM_THRESHOLD enables chunked streaming
+    """
+    extra = extra or {}
+    if not STREAM_THRESHOLD or len(items) < STREAM_THRESHOLD:
+        return FastJSONResponse({**extra, key: items})
+    return StreamingResponse(
+        _iter_json_list(key, items, extra), media_type="application/json")
+
+
+class _GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31 -> gzip container
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """
+    Parse an Accept-Encoding header into the set of encodings with q > 0
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with brotli or gzip
+    Picks brotli when the client accepts it and the module is installed,
+    skips bodies below minimum_size and compresses streamed bodies chunk by chunk
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, scope):
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accepted = _accepted_encodings(value.decode("latin-1"))
+                if brotli is not None and "br" in accepted:
+                    return _BrotliCompressor(self.brotli_quality)
+                if "gzip" in accepted:
+                    return _GzipCompressor(self.gzip_level)
+                return None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        compressor = self._negotiate(scope)
+        if compressor is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        started = False
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, started, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not started:
+                started = True
+                headers = [(k, v) for k, v in start_message["headers"]]
+                already_encoded = any(k == b"content-encoding" for k, _ in headers)
+
+                if already_encoded or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers = [(k, v) for k, v in headers if k != b"content-length"]
+                headers.append((b"content-encoding", compressor.encoding.encode("latin-1")))
+                headers.append((b"vary", b"Accept-Encoding"))
+
+                if not more_body:
+                    # Whole body available, compress in one shot
+                    body = compressor.compress(body) + compressor.finish()
+                    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                await send({**start_message, "headers": headers})
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
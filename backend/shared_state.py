@@ -0,0 +1,76 @@
+# backend/shared_state.py
+import os
+import heapq
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+    # Errors that mean Redis is unreachable, not that the call was wrong
+    REDIS_UNAVAILABLE = (RedisConnectionError, RedisTimeoutError, OSError)
+except ImportError:  # redis is only needed for the shared backends
+    redis_asyncio = None
+    REDIS_UNAVAILABLE = ()
+
+# Helpers for in-process state that can optionally be shared across workers
+# through Redis (rate limit buckets, presence/typing)
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+_redis_client = None
+
+
+def use_redis(env_var: str) -> bool:
+    """True when env_var (e.g. RATE_LIMIT_BACKEND) selects the Redis backend"""
+    return os.environ.get(env_var, "memory").lower() == "redis"
+
+
+def get_redis_client():
+    """One asyncio Redis client (and connection pool) shared by every backend"""
+    global _redis_client
+    if redis_asyncio is None:
+        raise RuntimeError("Redis backends require the 'redis' package (pip install redis)")
+    if _redis_client is None:
+        _redis_client = redis_asyncio.from_url(REDIS_URL)
+    return _redis_client
+
+
+class ExpiringMap:
+    """
+    Dict whose entries disappear once their expiry time passes
+    Expired entries are dropped in bulk from a min-heap of expiry times, so
+    each set is O(log n) no matter how many live keys there are.
+    Not locked: callers hold their own lock around read-modify-write.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> (expires_at, value)
+        self._heap = []  # (expires_at, key), may hold stale entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: str, now: float, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            return default
+        return entry[1]
+
+    def set(self, key: str, value, expires_at: float, now: float):
+        self._entries[key] = (expires_at, value)
+        heapq.heappush(self._heap, (expires_at, key))
+        self._sweep(now)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def _sweep(self, now: float):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            # Only delete if the key was not refreshed since this entry was pushed
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self._entries[key]
@@ -14,9 +14,12 @@ export default function ChatView({ apiBase }) {
     const [loading, setLoading] = useState(true);
     const [sending, setSending] = useState(false);
     const [error, setError] = useState("");
+    const [peerOnline, setPeerOnline] = useState(false);
+    const [peerTyping, setPeerTyping] = useState(false);
     const messagesEndRef = useRef(null);
     const pollIntervalRef = useRef(null);
     const inputRef = useRef(null);
+    const lastTypingSentRef = useRef(0);
 
     // Scroll to bottom of messages
     const scrollToBottom = () => {
@@ -52,6 +55,8 @@ export default function ChatView({ apiBase }) {
                     navigate("/login");
                     return;
                 }
+                // Rate limited - skip this poll, the next interval will retry
+                if (res.status === 429) return;
                 throw new Error("Failed to fetch messages");
             }
 
@@ -83,6 +88,8 @@ export default function ChatView({ apiBase }) {
             });
 
             setMessages(decryptedMessages);
+            setPeerOnline(Boolean(data.peer_online));
+            setPeerTyping((data.typing || []).length > 0);
             setLoading(false);
         } catch (err) {
             console.error("Error fetching messages:", err);
@@ -91,6 +98,35 @@ export default function ChatView({ apiBase }) {
         }
     }, [apiBase, chatId, navigate, aesKey]);
 
+    // Tell the server we are typing (held in memory server-side, expires after a few seconds)
+    const sendTyping = useCallback(
+        (typing) => {
+            const token = localStorage.getItem("token");
+            if (!token) return;
+
+            fetch(`${apiBase}/chat/${chatId}/typing`, {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/json",
+                    Authorization: `Bearer ${token}`,
+                },
+                body: JSON.stringify({ typing }),
+            }).catch((err) => console.error("Error sending typing:", err));
+        },
+        [apiBase, chatId]
+    );
+
+    const handleInputChange = (e) => {
+        setInputMessage(e.target.value);
+
+        // Throttle typing notifications to one every 2 seconds
+        const now = Date.now();
+        if (e.target.value && now - lastTypingSentRef.current > 2000) {
+            lastTypingSentRef.current = now;
+            sendTyping(true);
+        }
+    };
+
     const markAllAsRead = useCallback(async () => {
         const token = localStorage.getItem("token");
         if (!token) return;
@@ -231,6 +267,8 @@ export default function ChatView({ apiBase }) {
 
             // Clear input and fetch messages
             setInputMessage("");
+            lastTypingSentRef.current = 0;
+            sendTyping(false);
             fetchMessages();
 
             // Refocus input after sending
@@ -286,7 +324,11 @@ export default function ChatView({ apiBase }) {
                     <div>
                         <h1 className="text-lg font-medium">{peerEmail}</h1>
                         <p className="text-xs text-gray-400">
-                            End-to-end encrypted
+                            {peerTyping
+                                ? "typing..."
+                                : peerOnline
+                                ? "Online · End-to-end encrypted"
+                                : "End-to-end encrypted"}
                         </p>
                     </div>
                 </div>
@@ -367,7 +409,7 @@ export default function ChatView({ apiBase }) {
                         ref={inputRef}
                         type="text"
                         value={inputMessage}
-                        onChange={(e) => setInputMessage(e.target.value)}
+                        onChange={handleInputChange}
                         placeholder="Type a message"
                         disabled={sending}
                         autoFocus
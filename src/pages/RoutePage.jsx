@@ -228,7 +228,9 @@ export default function RoutePage({ apiBase }) {
                                                     {chat.peer_email}
                                                 </p>
                                                 <p className="text-sm text-gray-400">
-                                                    Tap to open chat
+                                                    {chat.peer_online
+                                                        ? "Online"
+                                                        : "Tap to open chat"}
                                                 </p>
                                             </div>
                                         </div>